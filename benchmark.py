@@ -0,0 +1,374 @@
+import argparse
+import csv
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from personData import PersonData
+from personDB import PersonDB
+from personServer import PersonTreeClient, PersonTreeServer, generate_tree
+from personTree import PersonTree
+from sharedAnalytics import SharedPeople
+from sketches import ApproxAnalytics
+
+
+def timeIt(func, *args, repeat=5):
+    """Return best wall time in seconds of func(*args) over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchSQLite(num_trees):
+    """Compare in-memory traversals with indexed SQL queries on saved trees."""
+    trees = [PersonTree() for _ in range(num_trees)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db = PersonDB(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        tree_ids = [db.saveTree(tree) for tree in trees]
+        save_time = time.perf_counter() - start
+        total = sum(db.countPeople(tree_id) for tree_id in tree_ids)
+        print(f"saved {num_trees} trees ({total} people) in {save_time:.4f}s")
+
+        queries = (
+            ("count", lambda t: t._countPeople(), db.countPeople),
+            ("by decade", lambda t: t.totalByDecade(), db.totalByDecade),
+            ("duplicates", lambda t: t.duplicateNames(), db.duplicateNames),
+        )
+        for name, mem_query, sql_query in queries:
+            mem_time = timeIt(lambda: [mem_query(t) for t in trees])
+            sql_time = timeIt(lambda: [sql_query(i) for i in tree_ids])
+            print(
+                f"{name:>12}: memory {mem_time:.4f}s  sqlite {sql_time:.4f}s"
+            )
+        db.close()
+
+
+def benchSharedMemory(num_trees, workers):
+    """Compare one worker with several over the same shared memory buffers."""
+    trees = [PersonTree() for _ in range(num_trees)]
+    start = time.perf_counter()
+    shared = SharedPeople(
+        (p for tree in trees for p in tree.people()), workers
+    )
+    export_time = time.perf_counter() - start
+    print(f"exported {shared.numPeople} people in {export_time:.4f}s")
+
+    with shared:
+        queries = (
+            ("by decade", lambda t: t.totalByDecade(), shared.totalByDecade),
+            ("duplicates", lambda t: t.duplicateNames(),
+             shared.duplicateNames),
+        )
+        for name, serial_query, shared_query in queries:
+            serial_time = timeIt(lambda: [serial_query(t) for t in trees])
+            one_time = timeIt(shared_query, 1)
+            par_time = timeIt(shared_query, workers)
+            print(
+                f"{name:>12}: shared x1 {one_time:.4f}s"
+                f"  shared x{workers} {par_time:.4f}s"
+                f"  parallel speedup {one_time / par_time:.2f}x"
+            )
+            print(
+                f"{'':>12}  tree traversal {serial_time:.4f}s"
+                f"  export + shared x{workers}"
+                f" {export_time + par_time:.4f}s"
+            )
+
+
+def checkServer(workers):
+    """Check every server endpoint through the client against a local tree."""
+    server = PersonTreeServer(port=0, warm=1, workers=workers)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = PersonTreeClient(port=server.server_address[1])
+    try:
+        for seed in (0, 5):
+            tree = generate_tree(seed)
+            assert client.generate(seed)["people"] == tree.numPeople
+            assert client.count(seed) == tree.numPeople
+            assert client.totalByDecade(seed) == {
+                decade: len(people)
+                for decade, people in tree.totalByDecade().items()
+            }
+            assert client.duplicateNames(seed) == tree.duplicateNames()
+            assert client.export(seed) == str(tree)
+        stats = client.stats()
+        assert stats["requests"] == 10 and stats["errors"] == 0, stats
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("server answers match local trees")
+
+
+def benchServer(num_requests, workers):
+    """Send concurrent requests to a warm local server; report latency."""
+    server = PersonTreeServer(port=0, warm=8, workers=workers)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = PersonTreeClient(port=server.server_address[1])
+
+    requests = (
+        client.count,
+        client.totalByDecade,
+        client.duplicateNames,
+        client.export,
+    )
+    start = time.perf_counter()
+    with ThreadPoolExecutor(8) as pool:
+        futures = [
+            pool.submit(requests[i % len(requests)], i % 16)
+            for i in range(num_requests)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    stats = client.stats()
+    print(
+        f"{stats['requests']} requests ({stats['errors']} errors)"
+        f" in {elapsed:.4f}s"
+    )
+    print(
+        f"mean {stats['mean_ms']:.2f}ms  p50 {stats['p50_ms']:.2f}ms"
+        f"  p99 {stats['p99_ms']:.2f}ms"
+        f"  throughput {stats['requests'] / elapsed:.1f} req/s"
+    )
+    server.shutdown()
+    server.server_close()
+
+
+def benchSketches(num_trees):
+    """Check sketch estimates against exact counts over many trees."""
+    approx = ApproxAnalytics()
+    start = time.perf_counter()
+    trees = [PersonTree(approx) for _ in range(num_trees)]
+    gen_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = Counter(
+        p.fName + " " + p.lName for tree in trees for p in tree.people()
+    )
+    by_decade = {}
+    for tree in trees:
+        for decade, people in tree.totalByDecade().items():
+            by_decade[decade] = by_decade.get(decade, 0) + len(people)
+    exact_time = time.perf_counter() - start
+    print(
+        f"{approx.numPeople} people: generation with sketches {gen_time:.4f}s,"
+        f" exact traversal {exact_time:.4f}s"
+    )
+    print(f"decade counts match exact: {approx.totalByDecade() == by_decade}")
+
+    distinct = approx.distinctNames()
+    print(
+        f"distinct names: exact {len(exact)}  hyperloglog {distinct:.0f}"
+        f"  error {abs(distinct - len(exact)) / len(exact):.2%}"
+        f"  (std error {approx.distinct.errorBound():.2%})"
+    )
+
+    bound = approx.nameCounts.errorBound()
+    overcounts = [
+        approx.nameCounts.estimate(name) - count
+        for name, count in exact.items()
+    ]
+    within = sum(1 for over in overcounts if over <= bound) / len(overcounts)
+    print(
+        f"count-min max overcount {max(overcounts)},"
+        f" {within:.2%} of names within bound {bound:.1f}"
+        f" (expected {1 - approx.nameCounts.delta:.0%})"
+    )
+
+    threshold = approx.topNames.errorBound()
+    heavy = {name for name, count in exact.items() if count > threshold}
+    kept = {name for name, _ in approx.topNames.top()}
+    top_exact = [name for name, _ in exact.most_common(10)]
+    top_approx = [name for name, _ in approx.duplicateNames(10)]
+    print(
+        f"heavy hitters above {threshold:.1f}: {len(heavy)},"
+        f" all kept: {heavy <= kept},"
+        f" top 10 overlap: {len(set(top_exact) & set(top_approx))}/10"
+    )
+
+
+def benchIndexes(num_trees, num_queries=200):
+    """Compare indexed name and birth year lookups with linear scans."""
+    trees = [PersonTree() for _ in range(num_trees)]
+    total = sum(tree.numPeople for tree in trees)
+    start = time.perf_counter()
+    for tree in trees:
+        tree.buildIndexes()
+    build_time = time.perf_counter() - start
+    print(f"indexed {total} people in {build_time:.4f}s")
+
+    prefixes = ["Ma", "John", "Li", "Emma S", "Zz"]
+    ranges = [(1950, 1955), (2000, 2000), (2050, 2100)]
+
+    def scanName(tree, prefix):
+        prefix = prefix.lower()
+        return [
+            p for p in tree.people()
+            if (p.fName + " " + p.lName).lower().startswith(prefix)
+        ]
+
+    def scanYear(tree, start_year, end_year):
+        return [
+            p for p in tree.people() if start_year <= p.yearBorn <= end_year
+        ]
+
+    lookups = (
+        ("name", prefixes, scanName, lambda t, q: t.findByName(q)),
+        ("birth year", ranges, lambda t, q: scanYear(t, *q),
+         lambda t, q: t.findByBirthYear(*q)),
+    )
+    for name, queries, scan, lookup in lookups:
+        def run(find):
+            for i in range(num_queries):
+                find(trees[i % len(trees)], queries[i % len(queries)])
+        scan_time = timeIt(run, scan)
+        index_time = timeIt(run, lookup)
+        print(
+            f"{name:>12}: scan {scan_time:.4f}s  index {index_time:.4f}s"
+            f"  speedup {scan_time / index_time:.1f}x"
+        )
+
+
+def benchPopulation(max_exponent):
+    """Generate forests of 10^4 up to 10^max_exponent people and time them."""
+    for exponent in range(4, max_exponent + 1):
+        target = 10 ** exponent
+        start = time.perf_counter()
+        tree = PersonTree(targetPopulation=target)
+        gen_time = time.perf_counter() - start
+        count_time = timeIt(tree._countPeople, repeat=1)
+        decade_time = timeIt(tree.totalByDecade, repeat=1)
+        dupe_time = timeIt(tree.duplicateNames, repeat=1)
+        print(
+            f"10^{exponent}: {tree.numPeople} people from"
+            f" {len(tree.roots)} couples, generate {gen_time:.2f}s,"
+            f" count {count_time:.2f}s, by decade {decade_time:.2f}s,"
+            f" duplicates {dupe_time:.2f}s"
+        )
+
+
+def writeScaledData(directory, scale):
+    """Write copies of the bundled csv files with scale times more names."""
+    for fileName in (
+        PersonData.birthAndMarriageFile,
+        PersonData.lifeExpectancyFile,
+        PersonData.rankToProbFile,
+    ):
+        shutil.copy(fileName, directory)
+
+    with open(PersonData.fNamesFile, newline="") as src, open(
+        os.path.join(directory, PersonData.fNamesFile), "w", newline=""
+    ) as dst:
+        reader = csv.reader(src)
+        writer = csv.writer(dst)
+        writer.writerow(next(reader))
+        for decade, gender, name, frequency in reader:
+            for i in range(scale):
+                writer.writerow(
+                    [decade, gender, f"{name}{i}", float(frequency) / scale]
+                )
+
+    with open(PersonData.lNamesFile, newline="") as src, open(
+        os.path.join(directory, PersonData.lNamesFile), "w", newline=""
+    ) as dst:
+        reader = csv.reader(src)
+        writer = csv.writer(dst)
+        writer.writerow(next(reader))
+        for decade, rank, name in reader:
+            for i in range(scale):
+                writer.writerow([decade, (int(rank) - 1) * scale + i + 1,
+                                 f"{name}{i}"])
+
+
+def benchIngest(scale):
+    """Report load time and memory of bundled and scale-times-larger data."""
+    with tempfile.TemporaryDirectory() as tmp:
+        writeScaledData(tmp, scale)
+        for label, directory in (("bundled", "."), (f"{scale}x", tmp)):
+            start = time.perf_counter()
+            pd = PersonData(directory)
+            load_time = time.perf_counter() - start
+            del pd
+            tracemalloc.start()
+            pd = PersonData(directory)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            names = sum(
+                len(names)
+                for decades in pd.firstNameDict.values()
+                for names in decades.values()
+            ) + sum(len(names) for names in pd.lastNameDict.values())
+            pick_time = timeIt(
+                lambda: [pd.getFName(1985, "female") for _ in range(10000)]
+            )
+            print(
+                f"{label:>8}: {names} names loaded in {load_time:.3f}s,"
+                f" held {current / 2 ** 20:.1f}MiB (peak {peak / 2 ** 20:.1f}MiB),"
+                f" 10000 picks {pick_time:.4f}s"
+            )
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"max resident memory {max_rss / 2 ** 10:.1f}MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kids in the Yard benchmarks")
+    parser.add_argument(
+        "bench",
+        choices=[
+            "sqlite", "shared", "server", "sketches", "indexes", "population",
+            "ingest", "server-check",
+        ],
+        help="benchmark to run",
+    )
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=100,
+        help="how many times larger the name datasets are for ingest",
+    )
+    parser.add_argument(
+        "--max-exponent",
+        type=int,
+        default=5,
+        help="largest population, as a power of ten, for population",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    match args.bench:
+        case "sqlite":
+            benchSQLite(args.trees)
+        case "shared":
+            benchSharedMemory(args.trees, args.workers)
+        case "server":
+            benchServer(args.requests, args.workers)
+        case "server-check":
+            checkServer(args.workers)
+        case "sketches":
+            benchSketches(args.trees)
+        case "indexes":
+            benchIndexes(args.trees)
+        case "population":
+            benchPopulation(args.max_exponent)
+        case "ingest":
+            benchIngest(args.scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,55 @@
+import argparse
 import sys
 
 from person import Person
-from personTree import PersonTree, pop
+from personDB import PersonDB
+from personServer import serve
+from personTree import PersonTree, pop, validate_founding
+from sharedAnalytics import SharedPeople
+from sketches import ApproxAnalytics
 
 
 class PersonTreeCLI:
     """
     PersonTreeCLI generates a person tree and provides a command-line menu
     to interact with it.
+    When given a database path, the tree is saved to sqlite and the
+    count, by-decade and duplicate name queries are answered with SQL.
+    When also given a stored tree id, no tree is generated or held in
+    memory and only the SQL queries are offered.
+    With workers, the by-decade and duplicate name queries are answered
+    by worker processes reducing shared memory buffers.
+    In approximate mode the by-decade and duplicate name queries are
+    answered from sketches updated while the tree is generated.
     """
 
-    def __init__(self):
-        self.tree = PersonTree()
+    def __init__(
+        self,
+        dbPath=None,
+        approx=False,
+        couples=1,
+        birthYears=None,
+        targetPopulation=None,
+        treeId=None,
+        workers=None,
+    ):
+        self.approx = None
+        self.shared = None
+        self.tree = None
+        self.db = None
+        self.treeId = treeId
+        if dbPath is not None:
+            self.db = PersonDB(dbPath)
+        if treeId is None:
+            self.approx = ApproxAnalytics() if approx else None
+            self.tree = PersonTree(
+                self.approx, couples, birthYears, targetPopulation
+            )
+            if self.db is not None:
+                self.treeId = self.db.saveTree(self.tree)
+                print(f"saved tree {self.treeId} to {dbPath}")
+            if workers is not None:
+                self.shared = SharedPeople(self.tree.people(), workers)
         self.menu()
 
     def menu(self):
@@ -22,13 +60,13 @@ class PersonTreeCLI:
             "        2. View total number of people by decade\n"
             "        3. View duplicate names\n"
             "        4. Write tree to file\n"
-            "        5. Exit\n"
+            "        5. Search people by name\n"
+            "        6. Search people by birth year range\n"
+            "        7. Exit\n"
             "Please enter the number of your selection: "
         )
         user_input = input(options).strip()
-        while user_input == "" or (
-            user_input < "1" and user_input > "5"
-        ):
+        while user_input not in ("1", "2", "3", "4", "5", "6", "7"):
             print("ERROR: INVALID INPUT")
             user_input = input(options).strip()
         else:
@@ -39,28 +77,62 @@ class PersonTreeCLI:
                     self.totalByDecade()
                 case "3":
                     self.duplicateNames()
+                case "4" | "5" | "6" if self.tree is None:
+                    print("ERROR: option needs a generated tree, "
+                          "not a stored one")
+                    self.menu()
                 case "4":
                     self.writeToFile()
                 case "5":
+                    self.searchByName()
+                case "6":
+                    self.searchByBirthYear()
+                case "7":
+                    if self.db is not None:
+                        self.db.close()
+                    if self.shared is not None:
+                        self.shared.close()
                     sys.exit(0)
 
     def totalPeople(self):
         """Print total number of people in tree."""
-        print(f"Total people in tree: {self.tree.numPeople}")
+        if self.db is not None:
+            total = self.db.countPeople(self.treeId)
+        else:
+            total = self.tree.numPeople
+        print(f"Total people in tree: {total}")
         self.menu()
 
     def totalByDecade(self):
         """Print number of people by birth decade."""
-        by_decade = self.tree.totalByDecade()
+        if self.approx is not None:
+            by_decade = self.approx.totalByDecade()
+        elif self.shared is not None:
+            by_decade = self.shared.totalByDecade()
+        elif self.db is not None:
+            by_decade = self.db.totalByDecade(self.treeId)
+        else:
+            by_decade = {
+                decade: len(people)
+                for decade, people in self.tree.totalByDecade().items()
+            }
 
         for decade in sorted(by_decade.keys()):
-            print(f"{decade}s: {len(by_decade[decade])}")
+            print(f"{decade}s: {by_decade[decade]}")
 
         self.menu()
 
     def duplicateNames(self):
         """Print duplicate full names in the tree."""
-        dupes = self.tree.duplicateNames()
+        if self.approx is not None:
+            self.approxDuplicateNames()
+            return
+        if self.shared is not None:
+            dupes = self.shared.duplicateNames()
+        elif self.db is not None:
+            dupes = self.db.duplicateNames(self.treeId)
+        else:
+            dupes = self.tree.duplicateNames()
         if not dupes:
             print("there are no duplicate names.")
         else:
@@ -70,6 +142,49 @@ class PersonTreeCLI:
 
         self.menu()
 
+    def approxDuplicateNames(self):
+        """Print estimated most duplicated names and distinct name count."""
+        print(
+            f"About {self.approx.distinctNames():.0f} distinct names "
+            f"in this tree."
+        )
+        dupes = self.approx.duplicateNames(10)
+        if not dupes:
+            print("there are no duplicate names.")
+        else:
+            print("Most duplicated names (estimated count):")
+            for name, count in dupes:
+                print(f"* {name} ({count})")
+
+        self.menu()
+
+    def searchByName(self):
+        """Print people whose full name starts with the entered text."""
+        prefix = input("Enter the start of a name: ")
+        self.printPeople(self.tree.findByName(prefix))
+        self.menu()
+
+    def searchByBirthYear(self):
+        """Print people born within the entered year range."""
+        try:
+            start_year = int(input("Enter the first birth year: "))
+            end_year = int(input("Enter the last birth year: "))
+        except ValueError:
+            print("ERROR: INVALID INPUT")
+        else:
+            self.printPeople(self.tree.findByBirthYear(start_year, end_year))
+        self.menu()
+
+    @staticmethod
+    def printPeople(people):
+        """Print name and birth year of each person found."""
+        if not people:
+            print("no people found.")
+            return
+        print(f"Found {len(people)} people:")
+        for person in people:
+            print(f"* {person.fName} {person.lName} (born {person.yearBorn})")
+
     def writeToFile(self):
         """Write tree to output.txt."""
         self.tree.writeToFile()
@@ -77,7 +192,126 @@ class PersonTreeCLI:
 
 
 def main():
-    PersonTreeCLI()
+    parser = argparse.ArgumentParser(description="Kids in the Yard")
+    parser.add_argument(
+        "--db",
+        default=None,
+        help="sqlite file to save the tree to and query from",
+    )
+    parser.add_argument(
+        "--tree-id",
+        type=int,
+        default=None,
+        help="query a tree already stored in --db instead of generating one",
+    )
+    parser.add_argument(
+        "--list-trees",
+        action="store_true",
+        help="list the tree ids stored in --db and exit",
+    )
+    parser.add_argument(
+        "--approx",
+        action="store_true",
+        help="answer by-decade and duplicate queries from sketches",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="answer by-decade and duplicate queries with this many "
+        "processes over shared memory",
+    )
+    parser.add_argument(
+        "--couples", type=int, default=1, help="number of founding couples"
+    )
+    parser.add_argument(
+        "--birth-years",
+        type=int,
+        nargs="+",
+        default=None,
+        help="birth years of the founding couples, cycled (default 1950)",
+    )
+    parser.add_argument(
+        "--population",
+        type=int,
+        default=None,
+        help="keep adding founding couples until about this many people exist",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="run a local server keeping seeded trees warm instead of the menu",
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--warm", type=int, default=4, help="seeded trees to pre-generate"
+    )
+    parser.add_argument(
+        "--max-trees",
+        type=int,
+        default=64,
+        help="most seeded trees the server keeps in memory",
+    )
+    args = parser.parse_args()
+    if args.serve:
+        if (
+            args.db is not None
+            or args.tree_id is not None
+            or args.list_trees
+            or args.approx
+            or args.couples != 1
+            or args.birth_years is not None
+            or args.population is not None
+        ):
+            parser.error(
+                "--serve only takes --port, --warm, --max-trees and --workers"
+            )
+        if args.max_trees < 1:
+            parser.error("--max-trees must be at least 1")
+        if args.workers is not None and args.workers < 1:
+            parser.error("--workers must be at least 1")
+        serve(
+            port=args.port,
+            warm=args.warm,
+            workers=args.workers,
+            maxTrees=args.max_trees,
+        )
+        return
+
+    try:
+        validate_founding(
+            args.couples,
+            args.birth_years or [Person.YEARSTART],
+            args.population,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if args.workers is not None:
+        if args.workers < 1:
+            parser.error("--workers must be at least 1")
+        if args.approx or args.tree_id is not None:
+            parser.error("--workers cannot be used with --approx or --tree-id")
+    if args.tree_id is not None or args.list_trees:
+        if args.db is None:
+            parser.error("--tree-id and --list-trees need --db")
+        db = PersonDB(args.db)
+        tree_ids = db.treeIds()
+        db.close()
+        if args.list_trees:
+            print(f"stored trees: {tree_ids}")
+            return
+        if args.tree_id not in tree_ids:
+            parser.error(f"no tree {args.tree_id} in {args.db}")
+
+    PersonTreeCLI(
+        args.db,
+        args.approx,
+        args.couples,
+        args.birth_years,
+        args.population,
+        args.tree_id,
+        args.workers,
+    )
 
 
 if __name__ == "__main__":
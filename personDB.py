@@ -0,0 +1,137 @@
+import sqlite3
+
+from person import Person
+
+
+class PersonDB:
+    """
+    PersonDB stores generated person trees in a local sqlite3 database.
+    Each tree is saved as a people table plus partner and parent edges,
+    and analytical queries are answered with indexed SQL.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS trees (
+            id INTEGER PRIMARY KEY
+        );
+        CREATE TABLE IF NOT EXISTS people (
+            tree_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            fName TEXT NOT NULL,
+            lName TEXT NOT NULL,
+            gender TEXT NOT NULL,
+            yearBorn INTEGER NOT NULL,
+            yearDied INTEGER NOT NULL,
+            decade INTEGER NOT NULL,
+            PRIMARY KEY (tree_id, id)
+        );
+        CREATE TABLE IF NOT EXISTS partners (
+            tree_id INTEGER NOT NULL,
+            person_id INTEGER NOT NULL,
+            partner_id INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS parents (
+            tree_id INTEGER NOT NULL,
+            child_id INTEGER NOT NULL,
+            parent_id INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS people_decade
+            ON people (tree_id, decade);
+        CREATE INDEX IF NOT EXISTS people_name
+            ON people (tree_id, fName, lName);
+        CREATE INDEX IF NOT EXISTS partners_person
+            ON partners (tree_id, person_id);
+        CREATE INDEX IF NOT EXISTS parents_child
+            ON parents (tree_id, child_id);
+    """
+
+    def __init__(self, path="trees.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def saveTree(self, tree):
+        """Bulk-load tree into the database in one transaction; return tree id."""
+        with self.conn:
+            tree_id = self.conn.execute(
+                "INSERT INTO trees DEFAULT VALUES"
+            ).lastrowid
+
+            ids = {}
+            people_rows = []
+            for person in tree.people():
+                ids[id(person)] = len(ids)
+                people_rows.append((
+                    tree_id,
+                    ids[id(person)],
+                    person.fName,
+                    person.lName,
+                    person.gender,
+                    person.yearBorn,
+                    person.yearDied,
+                    (person.yearBorn // 10) * 10,
+                ))
+
+            partner_rows = []
+            parent_rows = []
+            for person in tree.people():
+                person_id = ids[id(person)]
+                if person.partner is not None:
+                    partner_rows.append(
+                        (tree_id, person_id, ids[id(person.partner)])
+                    )
+                for parent in (person.parent1, person.parent2):
+                    if parent is not None:
+                        parent_rows.append(
+                            (tree_id, person_id, ids[id(parent)])
+                        )
+
+            self.conn.executemany(
+                "INSERT INTO people VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                people_rows,
+            )
+            self.conn.executemany(
+                "INSERT INTO partners VALUES (?, ?, ?)", partner_rows
+            )
+            self.conn.executemany(
+                "INSERT INTO parents VALUES (?, ?, ?)", parent_rows
+            )
+        return tree_id
+
+    def treeIds(self):
+        """Return ids of all trees stored in the database."""
+        rows = self.conn.execute("SELECT id FROM trees ORDER BY id")
+        return [row[0] for row in rows]
+
+    def countPeople(self, tree_id):
+        """Return number of people in the stored tree."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM people WHERE tree_id = ?", (tree_id,)
+        ).fetchone()[0]
+
+    def totalByDecade(self, tree_id):
+        """Return dictionary of people counts keyed by birth decade."""
+        rows = self.conn.execute(
+            "SELECT decade, COUNT(*) FROM people WHERE tree_id = ? "
+            "GROUP BY decade ORDER BY decade",
+            (tree_id,),
+        )
+        by_decade = {
+            decade: 0
+            for decade in range(Person.YEARSTART, Person.YEAREND + 1, 10)
+        }
+        by_decade.update(rows)
+        return by_decade
+
+    def duplicateNames(self, tree_id):
+        """Return list of full names shared by more than one person."""
+        rows = self.conn.execute(
+            "SELECT fName || ' ' || lName FROM people WHERE tree_id = ? "
+            "GROUP BY fName, lName HAVING COUNT(*) > 1",
+            (tree_id,),
+        )
+        return [row[0] for row in rows]
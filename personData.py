@@ -1,6 +1,10 @@
-import copy
+import csv
+import itertools
 import math
+import os
 import random
+from array import array
+from bisect import bisect_right
 
 from person import Person
 
@@ -9,6 +13,8 @@ class PersonData:
     """
     PersonData reads CSV files containing data about people.
     Creates dictionaries used to randomly generate person attributes.
+    Files are streamed row by row from dataDir, decades come from the data,
+    and each decade's names are kept in a compact WeightedNames table.
     """
 
     birthAndMarriageFile = "birth_and_marriage_rates.csv"
@@ -18,105 +24,124 @@ class PersonData:
     lifeExpectancyFile = "life_expectancy.csv"
     rankToProbFile = "rank_to_probability.csv"
 
-    def __init__(self):
+    def __init__(self, dataDir="."):
         print("Reading files...")
+        self.dataDir = dataDir
 
         self._readBAM()              # sets birthDict and marriageDict dictionaries
         self._readFNames()           # sets firstNameDict dictionary
+        self._readRankToProb()       # sets rankDict dictionary
         self._readLNames()           # sets lastNameDict dictionary
         self._readLifeExpec()        # sets expectancyDict dictionary
-        self._readRankToProb()       # sets rankDict dictionary
+        self._checkDecades()
 
         print("File read complete!")
 
+    def _checkDecades(self):
+        """Raise ValueError if a simulated decade is missing from the data."""
+        tables = (
+            (self.birthAndMarriageFile, "birth and marriage rates",
+             self.birthDict),
+            (self.fNamesFile, "male names", self.firstNameDict["male"]),
+            (self.fNamesFile, "female names", self.firstNameDict["female"]),
+            (self.lNamesFile, "last names", self.lastNameDict),
+        )
+        for decade in range(Person.YEARSTART, Person.YEAREND + 1, 10):
+            for fileName, what, table in tables:
+                if decade not in table:
+                    raise ValueError(
+                        f"ERROR READING DATA: {fileName} has no {what} "
+                        f"for the {decade}s"
+                    )
+
+    def _rows(self, fileName):
+        """Yield parsed rows of a data file one at a time, skipping the header."""
+        with open(os.path.join(self.dataDir, fileName), newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            yield from reader
+
     def _readBAM(self):
         """Read birth and marriage file; set birthDict and marriageDict."""
-        with open(self.birthAndMarriageFile) as f:
-            f.readline()
-            birth_rates = {}
-            marriage_rates = {}
-            for line in f.readlines():
-                data = line.split(",")
-                year = int(data[0][:4])
-                birth = float(data[1])
-                marriage = float(data[2])
-                birth_rates[year] = birth
-                marriage_rates[year] = marriage
+        birth_rates = {}
+        marriage_rates = {}
+        for data in self._rows(self.birthAndMarriageFile):
+            year = int(data[0][:4])
+            birth = float(data[1])
+            marriage = float(data[2])
+            birth_rates[year] = birth
+            marriage_rates[year] = marriage
         self.birthDict = birth_rates
         self.marriageDict = marriage_rates
 
     def _readgenderNameProb(self):
         """Read gender_name_probability file (NOT NECESSARY)."""
-        with open(self.genderNameProbFile) as f:
-            f.readline()
-            gender_name_probability = {}
-            for line in f.readlines()[::2]:
-                data = line.split(",")
-                year = int(data[0][:4])
-                m_prob = float(data[2])
-                gender_name_probability[year] = m_prob
+        gender_name_probability = {}
+        rows = self._rows(self.genderNameProbFile)
+        for data in itertools.islice(rows, 0, None, 2):
+            year = int(data[0][:4])
+            m_prob = float(data[2])
+            gender_name_probability[year] = m_prob
         self.genderNameProbability = gender_name_probability
 
     def _readFNames(self):
-        """Read first_names.csv; produce dict with keys gender, year, name."""
-        empty_year_container = {
-            1950: {}, 1960: {}, 1970: {}, 1980: {}, 1990: {}, 2000: {},
-            2010: {}, 2020: {}, 2030: {}, 2040: {}, 2050: {}, 2060: {},
-            2070: {}, 2080: {}, 2090: {}, 2100: {}, 2110: {}, 2120: {},
-        }
-        first_names = {
-            "male": empty_year_container,
-            "female": copy.deepcopy(empty_year_container),
-        }
-        with open(self.fNamesFile) as f:
-            f.readline()
-            for line in f.readlines():
-                data = line.split(",")
-                year = int(data[0][:4])
-                gender = data[1]
-                name = data[2]
-                frequency = float(data[3])
-                first_names[gender][year][name] = frequency
+        """Read first_names.csv; produce dict with keys gender, decade."""
+        first_names = {"male": {}, "female": {}}
+        for data in self._rows(self.fNamesFile):
+            year = int(data[0][:4])
+            gender = data[1]
+            name = data[2].strip()
+            frequency = float(data[3])
+            if year not in first_names[gender]:
+                first_names[gender][year] = WeightedNames()
+            first_names[gender][year].append(name, frequency)
+        for decades in first_names.values():
+            for names in decades.values():
+                names.finish()
         self.firstNameDict = first_names
 
     def _readLNames(self):
-        """Read last_names.csv; produce dict with keys year, last name."""
-        last_names = {
-            1950: {}, 1960: {}, 1970: {}, 1980: {}, 1990: {}, 2000: {},
-            2010: {}, 2020: {}, 2030: {}, 2040: {}, 2050: {}, 2060: {},
-            2070: {}, 2080: {}, 2090: {}, 2100: {}, 2110: {}, 2120: {},
-        }
-        with open(self.lNamesFile) as f:
-            f.readline()
-            for line in f.readlines():
-                data = line.split(",")
-                year = int(data[0][:4])
-                rank = int(data[1])
-                last_name = data[2].strip()
-                last_names[year][last_name] = rank
+        """Read last_names.csv; produce dict with keys decade."""
+        last_names = {}
+        for data in self._rows(self.lNamesFile):
+            year = int(data[0][:4])
+            rank = int(data[1])
+            last_name = data[2].strip()
+            if year not in last_names:
+                last_names[year] = WeightedNames()
+            last_names[year].append(last_name, self.rankProbability(rank))
+        for names in last_names.values():
+            names.finish()
         self.lastNameDict = last_names
 
     def _readLifeExpec(self):
         """Read life_expectancy.csv; produce dict by year."""
         life_expectancy = {}
-        with open(self.lifeExpectancyFile) as f:
-            f.readline()
-            for line in f.readlines():
-                data = line.split(",")
-                year = int(data[0])
-                expectancy = float(data[1])
-                life_expectancy[year] = expectancy
+        for data in self._rows(self.lifeExpectancyFile):
+            year = int(data[0])
+            expectancy = float(data[1])
+            life_expectancy[year] = expectancy
         self.expectancyDict = life_expectancy
 
     def _readRankToProb(self):
         """Read rank_to_probability.csv; return dict by rank."""
-        with open(self.rankToProbFile) as f:
+        path = os.path.join(self.dataDir, self.rankToProbFile)
+        with open(path) as f:
             all_data = f.readline().split(",")
         rank_to_probability = {}
         for i, d in enumerate(all_data, start=1):
             rank_to_probability[i] = float(d)
         self.rankDict = rank_to_probability
 
+    def rankProbability(self, rank):
+        """Return probability of a last name rank.
+        Ranks past rank_to_probability.csv follow its Zipf tail (p ~ 1 / rank).
+        """
+        if rank in self.rankDict:
+            return self.rankDict[rank]
+        last_rank = len(self.rankDict)
+        return self.rankDict[last_rank] * last_rank / rank
+
     def printFNames(self):
         """Print all first names by gender and decade."""
         print("MALE NAMES:")
@@ -134,8 +159,8 @@ class PersonData:
         """Print all last names by year."""
         for year, names in self.lastNameDict.items():
             print(f"{year}s:")
-            for name, rank in names.items():
-                print(f"name: {name}\trank:{rank}")
+            for name, prob in names.items():
+                print(f"name: {name}\tprobability:{prob}")
 
     def getYearDied(self, birth_year):
         """Return random year of death based on birth year."""
@@ -149,21 +174,13 @@ class PersonData:
         birth_year = Person.validateYear(birth_year)
         decade = get_decade(birth_year)
         gender = Person.validateGender(gender)
-        curr_dict = self.firstNameDict[gender][decade]
-        return random.choices(
-            list(curr_dict.keys()),
-            weights=list(curr_dict.values()),
-        )[0]
+        return self.firstNameDict[gender][decade].choice()
 
     def getLName(self, birth_year):
         """Return random last name based on birth year."""
         birth_year = Person.validateYear(birth_year)
         decade = get_decade(birth_year)
-        curr_dict = self.lastNameDict[decade]
-        return random.choices(
-            list(curr_dict.keys()),
-            weights=list(self.rankDict.values()),
-        )[0]
+        return self.lastNameDict[decade].choice()
 
     def getPartner(self, birth_year):
         """Return bool for having a partner based on birth year."""
@@ -313,6 +330,75 @@ class PersonData:
         return new_children
 
 
+class WeightedNames:
+    """
+    WeightedNames stores one decade's names compactly: the names sorted and
+    joined into a single string with an array of offsets, and an array of
+    cumulative weights used to pick a name with bisect.
+    Names are appended one at a time while a file is read, then finish()
+    sorts them, so no per-name objects are kept for the whole file.
+    """
+
+    __slots__ = ("_blob", "_offsets", "_cumWeights", "_parts")
+
+    def __init__(self):
+        self._blob = ""
+        self._parts = bytearray()
+        self._offsets = array("L", [0])
+        self._cumWeights = array("d")
+
+    def append(self, name, weight):
+        """Add a name; weights are cumulative until finish() is called."""
+        encoded = name.encode()
+        self._parts += encoded
+        self._offsets.append(self._offsets[-1] + len(encoded))
+        previous = self._cumWeights[-1] if self._cumWeights else 0.0
+        self._cumWeights.append(previous + weight)
+
+    def finish(self):
+        """Sort the appended names and their weights by name; return self."""
+        encoded = self._parts
+        self._parts = None
+        offsets = self._offsets
+        cum_weights = self._cumWeights
+        names = [
+            encoded[offsets[i]:offsets[i + 1]].decode()
+            for i in range(len(cum_weights))
+        ]
+        del encoded
+        order = sorted(range(len(names)), key=names.__getitem__)
+
+        self._offsets = array("L", [0])
+        self._cumWeights = array("d")
+        total = 0.0
+        for i in order:
+            self._offsets.append(self._offsets[-1] + len(names[i]))
+            total += cum_weights[i] - (cum_weights[i - 1] if i else 0.0)
+            self._cumWeights.append(total)
+        self._blob = "".join(names[i] for i in order)
+        return self
+
+    def __len__(self):
+        return len(self._cumWeights)
+
+    def name(self, i):
+        """Return the i-th name in sorted order."""
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    def items(self):
+        """Yield (name, weight) pairs in sorted name order."""
+        previous = 0.0
+        for i, cum_weight in enumerate(self._cumWeights):
+            yield self.name(i), cum_weight - previous
+            previous = cum_weight
+
+    def choice(self):
+        """Return a random name, weighted by its frequency."""
+        total = self._cumWeights[-1]
+        i = bisect_right(self._cumWeights, random.random() * total)
+        return self.name(min(i, len(self) - 1))
+
+
 def get_decade(year):
     """Return decade (e.g. 1985 -> 1980)."""
     return math.floor(year / 10) * 10
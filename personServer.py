@@ -0,0 +1,224 @@
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import urlopen
+
+from personTree import PersonTree
+
+
+class PersonTreeServer(ThreadingHTTPServer):
+    """
+    PersonTreeServer is a long-running local HTTP server that keeps
+    PersonData and a pool of seeded trees warm between requests.
+    Tree generation runs in worker processes; queries run in threads.
+    At most maxTrees trees are kept, least recently used first out.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8000,
+        warm=4,
+        workers=None,
+        maxTrees=64,
+    ):
+        super().__init__((host, port), PersonTreeHandler)
+        self.executor = ProcessPoolExecutor(workers)
+        self.maxTrees = max(1, maxTrees)
+        self.trees = OrderedDict()
+        self.pending = {}
+        self.treesLock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+        self.statsLock = threading.Lock()
+        self.startTime = time.perf_counter()
+        warm = min(warm, self.maxTrees)
+        for seed, tree in zip(
+            range(warm), self.executor.map(generate_tree, range(warm))
+        ):
+            self.trees[seed] = tree
+
+    def getTree(self, seed):
+        """Return tree for seed, generating it in a worker process if needed.
+        Concurrent requests for the same missing seed share one generation.
+        """
+        with self.treesLock:
+            tree = self.trees.get(seed)
+            if tree is not None:
+                self.trees.move_to_end(seed)
+                return tree
+            future = self.pending.get(seed)
+            owner = future is None
+            if owner:
+                future = self.executor.submit(generate_tree, seed)
+                self.pending[seed] = future
+
+        if not owner:
+            return future.result()
+        try:
+            tree = future.result()
+        finally:
+            with self.treesLock:
+                del self.pending[seed]
+        with self.treesLock:
+            self.trees[seed] = tree
+            while len(self.trees) > self.maxTrees:
+                self.trees.popitem(last=False)
+        return tree
+
+    def recordLatency(self, seconds, failed=False):
+        """Record latency of a served request and whether it failed."""
+        with self.statsLock:
+            self.latencies.append(seconds)
+            if failed:
+                self.errors += 1
+
+    def stats(self):
+        """Return request count, latency percentiles (ms) and throughput."""
+        with self.statsLock:
+            latencies = sorted(self.latencies)
+            errors = self.errors
+        with self.treesLock:
+            num_trees = len(self.trees)
+        uptime = time.perf_counter() - self.startTime
+        rval = {
+            "requests": len(latencies),
+            "errors": errors,
+            "uptime": uptime,
+            "throughput": len(latencies) / uptime,
+            "trees": num_trees,
+        }
+        if latencies:
+            rval["mean_ms"] = 1000 * sum(latencies) / len(latencies)
+            rval["p50_ms"] = 1000 * latencies[len(latencies) // 2]
+            rval["p99_ms"] = 1000 * latencies[int(len(latencies) * 0.99)]
+        return rval
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+
+class PersonTreeHandler(BaseHTTPRequestHandler):
+    """
+    PersonTreeHandler answers GET requests for a PersonTreeServer:
+    /generate, /count, /decades, /duplicates and /export take a
+    ?seed= parameter; /stats reports latency and throughput.
+    """
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            seed = int(query.get("seed", ["0"])[0])
+        except ValueError:
+            self._send(400, {"error": "seed must be an int"})
+            return
+
+        if url.path == "/stats":
+            self._send(200, self.server.stats())
+            return
+
+        failed = False
+        content_type = "application/json"
+        try:
+            match url.path:
+                case "/generate" | "/count":
+                    tree = self.server.getTree(seed)
+                    body = {"seed": seed, "people": tree.numPeople}
+                case "/decades":
+                    by_decade = self.server.getTree(seed).totalByDecade()
+                    body = {
+                        str(decade): len(people)
+                        for decade, people in by_decade.items()
+                    }
+                case "/duplicates":
+                    body = self.server.getTree(seed).duplicateNames()
+                case "/export":
+                    body = str(self.server.getTree(seed))
+                    content_type = "text/plain"
+                case _:
+                    self._send(404, {"error": f"unknown path {url.path}"})
+                    return
+        except Exception as e:
+            failed = True
+            body = {"error": f"{type(e).__name__}: {e}"}
+        # record before replying so a client reading /stats next sees it
+        self.server.recordLatency(time.perf_counter() - start, failed)
+        self._send(500 if failed else 200, body, content_type)
+
+    def _send(self, status, body, content_type="application/json"):
+        """Send body as the response, JSON-encoding non-text bodies."""
+        if content_type == "application/json":
+            body = json.dumps(body)
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Silence per-request logging."""
+
+
+class PersonTreeClient:
+    """PersonTreeClient sends requests to a running PersonTreeServer."""
+
+    def __init__(self, host="127.0.0.1", port=8000):
+        self.baseUrl = f"http://{host}:{port}"
+
+    def _get(self, path, seed=None):
+        """GET path and return the decoded response body."""
+        url = self.baseUrl + path
+        if seed is not None:
+            url += "?" + urlencode({"seed": seed})
+        with urlopen(url) as response:
+            body = response.read().decode()
+            if response.headers.get_content_type() == "application/json":
+                return json.loads(body)
+            return body
+
+    def generate(self, seed):
+        return self._get("/generate", seed)
+
+    def count(self, seed):
+        return self._get("/count", seed)["people"]
+
+    def totalByDecade(self, seed):
+        return {int(k): v for k, v in self._get("/decades", seed).items()}
+
+    def duplicateNames(self, seed):
+        return self._get("/duplicates", seed)
+
+    def export(self, seed):
+        return self._get("/export", seed)
+
+    def stats(self):
+        return self._get("/stats")
+
+
+def generate_tree(seed):
+    """Generate a tree from seed; run inside a worker process."""
+    random.seed(seed)
+    return PersonTree()
+
+
+def serve(host="127.0.0.1", port=8000, warm=4, workers=None, maxTrees=64):
+    """Run a PersonTreeServer until interrupted."""
+    server = PersonTreeServer(host, port, warm, workers, maxTrees)
+    print(f"serving on http://{host}:{port} with {len(server.trees)} warm trees")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
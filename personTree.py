@@ -1,41 +1,82 @@
+from bisect import bisect_left, bisect_right
+from collections import deque
+
 from person import Person, YearEndError
 from personData import PersonData
 
 
 class PersonTree:
     """
-    PersonTree represents the family tree.
+    PersonTree represents the family tree, a forest of founding couples.
     Uses PersonData to generate roots and populate the tree.
+    couples founding couples are created, born in birthYears (cycled);
+    with targetPopulation, couples are added until about that many
+    people exist.
+    An optional analytics object (e.g. sketches.ApproxAnalytics) has
+    add(person) called for every person as they are generated.
     """
 
     pd = PersonData()
 
-    def __init__(self):
-        person_root1 = self.pd.createPersonWOP(Person.YEARSTART, Person.MALE)
-        person_root2 = self.pd.createPersonWOP(Person.YEARSTART, Person.FEMALE)
+    def __init__(
+        self,
+        analytics=None,
+        couples=1,
+        birthYears=None,
+        targetPopulation=None,
+    ):
+        self.analytics = analytics
+        self.birthYears = birthYears or [Person.YEARSTART]
+        validate_founding(couples, self.birthYears, targetPopulation)
+        self.roots = []
+        self.actionQueue = deque()
+        self._generated = 0
 
-        person_root1.partner = person_root2
-        person_root2.partner = person_root1
+        for _ in range(couples):
+            self.addCouple()
+            self.generateTree()
+        if targetPopulation is not None:
+            while self._generated < targetPopulation:
+                self.addCouple()
+                self.generateTree()
+        print("finished generation!")
 
-        new_children = self.pd.createChildren(person_root1, person_root2)
+        self.root1 = self.roots[0]
+        self.root2 = self.root1.partner
+        self.numPeople = self._countPeople()
+        self._nameIndex = None
+        self._yearIndex = None
 
-        self.root1 = person_root1
-        self.root2 = person_root2
-        self.actionQueue = new_children
+    def addCouple(self):
+        """Create the next founding couple and queue their children."""
+        year = self.birthYears[len(self.roots) % len(self.birthYears)]
+        person_root1 = self.pd.createPersonWOP(year, Person.MALE)
+        person_root2 = self.pd.createPersonWOP(year, Person.FEMALE)
 
-        self.generateTree()
-        self.numPeople = self._countPeople()
+        person_root1.partner = person_root2
+        person_root2.partner = person_root1
+
+        self._observe(person_root1, person_root2)
+        self.roots.append(person_root1)
+        try:
+            new_children = self.pd.createChildren(person_root1, person_root2)
+            self.actionQueue.extend(new_children)
+        except YearEndError:
+            pass
+        finally:
+            self._observe(*person_root1.children)
 
     def generateTree(self):
         """Generate partners and children for everyone in the action queue."""
         while self.actionQueue:
+            current = self.actionQueue.popleft()
+            num_children = len(current.children)
             try:
-                current = pop(self.actionQueue)
-
                 has_partner = self.pd.getPartner(current.yearBorn)
                 c_partner = None
                 if has_partner:
                     c_partner = self.pd.createPartner(current)
+                    self._observe(c_partner)
 
                 new_children = self.pd.createChildren(current, c_partner)
                 self.actionQueue.extend(new_children)
@@ -43,14 +84,22 @@ class PersonTree:
             except YearEndError:
                 continue
 
-        print("finished generation!")
+            finally:
+                self._observe(*current.children[num_children:])
+
+    def _observe(self, *people):
+        """Count newly generated people and pass them to analytics, if any."""
+        self._generated += len(people)
+        if self.analytics is not None:
+            for person in people:
+                self.analytics.add(person)
 
     def _countPeople(self):
-        """Count unique people in tree via BFS from root1."""
+        """Count unique people in tree via BFS from the roots."""
         visited = set()
-        queue = [self.root1]
+        queue = deque(self.roots)
         while queue:
-            current = pop(queue)
+            current = queue.popleft()
             if id(current) in visited:
                 queue.extend(current.children)
                 continue
@@ -64,12 +113,67 @@ class PersonTree:
             queue.extend(current.children)
         return len(visited)
 
+    def people(self):
+        """Yield every unique person in the tree, partners included."""
+        visited = set()
+        search_queue = deque(self.roots)
+        while search_queue:
+            current = search_queue.popleft()
+            if id(current) in visited:
+                continue
+            visited.add(id(current))
+            yield current
+            partner = current.partner
+            if partner is not None and id(partner) not in visited:
+                visited.add(id(partner))
+                yield partner
+            search_queue.extend(current.children)
+
+    def buildIndexes(self):
+        """Build sorted name and birth year indexes over everyone in the tree.
+        Each index is otherwise built on its first lookup.
+        """
+        self._buildNameIndex()
+        self._buildYearIndex()
+
+    def _buildNameIndex(self):
+        """Sort everyone by lower-cased full name for prefix search."""
+        by_name = sorted(
+            ((p.fName + " " + p.lName).lower(), i, p)
+            for i, p in enumerate(self.people())
+        )
+        self._nameKeys = [key for key, _, _ in by_name]
+        self._nameIndex = [p for _, _, p in by_name]
+
+    def _buildYearIndex(self):
+        """Sort everyone by birth year for range search."""
+        by_year = sorted(self.people(), key=lambda p: p.yearBorn)
+        self._yearKeys = [p.yearBorn for p in by_year]
+        self._yearIndex = by_year
+
+    def findByName(self, prefix):
+        """Return people whose full name starts with prefix (ignores case)."""
+        if self._nameIndex is None:
+            self._buildNameIndex()
+        prefix = prefix.strip().lower()
+        start = bisect_left(self._nameKeys, prefix)
+        end = bisect_left(self._nameKeys, prefix + "\U0010ffff", start)
+        return self._nameIndex[start:end]
+
+    def findByBirthYear(self, start_year, end_year):
+        """Return people born from start_year to end_year inclusive."""
+        if self._yearIndex is None:
+            self._buildYearIndex()
+        start = bisect_left(self._yearKeys, start_year)
+        end = bisect_right(self._yearKeys, end_year, start)
+        return self._yearIndex[start:end]
+
     def __str__(self):
         last_gen = 0
         rval = []
-        search_queue = [(self.root1, 1)]
+        search_queue = deque((root, 1) for root in self.roots)
         while search_queue:
-            current, gen = pop(search_queue)
+            current, gen = search_queue.popleft()
             if gen > last_gen:
                 last_gen = gen
                 rval.append(
@@ -89,10 +193,10 @@ class PersonTree:
 
     def duplicateNames(self):
         """get all duplicate full names in the tree and return list."""
-        search_queue = [self.root1]
+        search_queue = deque(self.roots)
         seen = {}
         while search_queue:
-            current = pop(search_queue)
+            current = search_queue.popleft()
             full_name = current.fName + " " + current.lName
             if full_name not in seen:
                 seen[full_name] = {current}
@@ -125,9 +229,9 @@ class PersonTree:
             )
         }
         visited = set()
-        search_queue = [self.root1]
+        search_queue = deque(self.roots)
         while search_queue:
-            current = pop(search_queue)
+            current = search_queue.popleft()
             if id(current) in visited:
                 continue
             visited.add(id(current))
@@ -149,6 +253,24 @@ class PersonTree:
         return by_decade  
     
 
+def validate_founding(couples, birthYears, targetPopulation):
+    """Raise ValueError describing the first bad founding couple setting."""
+    if couples < 0:
+        raise ValueError("number of founding couples must be 0 or more")
+    if targetPopulation is not None and targetPopulation <= 0:
+        raise ValueError("target population must be greater than 0")
+    if couples == 0 and targetPopulation is None:
+        raise ValueError(
+            "at least one founding couple or a target population expected"
+        )
+    for year in birthYears:
+        if not Person.YEARSTART <= year <= Person.YEAREND:
+            raise ValueError(
+                f"founding birth year {year} outside "
+                f"{Person.YEARSTART}-{Person.YEAREND}"
+            )
+
+
 def pop(lst):
     """Remove and return first element of list; modifies in place."""
     if not lst:
@@ -0,0 +1,123 @@
+import array
+from collections import Counter
+from multiprocessing import Pool, shared_memory
+
+from person import Person
+
+
+class SharedPeople:
+    """
+    SharedPeople exports birth years and full name ids of many people into
+    multiprocessing.shared_memory buffers so worker processes can reduce
+    shards of them without the person data being copied or pickled.
+    The worker pool is started once and reused until close().
+    """
+
+    def __init__(self, people, workers=4):
+        name_ids = {}
+        names = []
+        years = array.array("i")
+        keys = array.array("i")
+        for person in people:
+            full_name = person.fName + " " + person.lName
+            name_id = name_ids.get(full_name)
+            if name_id is None:
+                name_id = len(names)
+                name_ids[full_name] = name_id
+                names.append(full_name)
+            years.append(person.yearBorn)
+            keys.append(name_id)
+
+        self.names = names
+        self.numPeople = len(years)
+        self._yearsShm = _toShared(years)
+        self._keysShm = _toShared(keys)
+        self.workers = workers
+        self._pool = Pool(workers) if workers > 1 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut down the worker pool and release the shared memory buffers."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for shm in (self._yearsShm, self._keysShm):
+            shm.close()
+            shm.unlink()
+
+    def _shards(self, workers):
+        """Return (start, stop) index pairs splitting people into shards."""
+        size = -(-self.numPeople // workers) if self.numPeople else 0
+        return [
+            (start, min(start + size, self.numPeople))
+            for start in range(0, self.numPeople, size or 1)
+        ]
+
+    def _map(self, func, shm, workers):
+        """Run func over workers shards of shm; in this process if workers is 1."""
+        workers = self.workers if workers is None else workers
+        jobs = [(shm.name, start, stop) for start, stop in self._shards(workers)]
+        if workers == 1 or self._pool is None:
+            return [func(*job) for job in jobs]
+        return self._pool.starmap(func, jobs)
+
+    def totalByDecade(self, workers=None):
+        """Return dictionary of people counts keyed by birth decade."""
+        by_decade = {
+            decade: 0
+            for decade in range(Person.YEARSTART, Person.YEAREND + 1, 10)
+        }
+        for partial in self._map(_decadeShard, self._yearsShm, workers):
+            for decade, count in partial.items():
+                by_decade[decade] = by_decade.get(decade, 0) + count
+        return by_decade
+
+    def duplicateNames(self, workers=None):
+        """Return list of full names shared by more than one person."""
+        counts = Counter()
+        for partial in self._map(_nameShard, self._keysShm, workers):
+            counts.update(partial)
+        return [self.names[key] for key, count in counts.items() if count > 1]
+
+
+def _toShared(values):
+    """Copy an int array into a new shared memory block and return it."""
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, len(values) * values.itemsize)
+    )
+    shm.buf[:len(values) * values.itemsize] = memoryview(values).cast("B")
+    return shm
+
+
+def _reduceShard(shm_name, start, stop, reducer):
+    """Apply reducer to a view of one shard of a shared int buffer."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    values = shm.buf.cast("i")
+    shard = values[start:stop]
+    try:
+        return reducer(shard)
+    finally:
+        shard.release()
+        values.release()
+        shm.close()
+
+
+def _decadeShard(shm_name, start, stop):
+    """Count birth decades in one shard of the shared birth years."""
+    return _reduceShard(
+        shm_name,
+        start,
+        stop,
+        lambda years: Counter((year // 10) * 10 for year in years),
+    )
+
+
+def _nameShard(shm_name, start, stop):
+    """Count full name ids in one shard of the shared name ids."""
+    return _reduceShard(shm_name, start, stop, Counter)
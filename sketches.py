@@ -0,0 +1,210 @@
+import hashlib
+import math
+
+from person import Person
+
+
+class CountMinSketch:
+    """
+    CountMinSketch estimates how often each item was added in fixed memory.
+    Estimates never undercount; with probability 1 - delta they overcount
+    by at most epsilon * total, where width = ceil(e / epsilon) and
+    depth = ceil(ln(1 / delta)).
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.epsilon = epsilon
+        self.delta = delta
+        self.total = 0
+        self.rows = [[0] * self.width for _ in range(self.depth)]
+
+    def _columns(self, h1, h2):
+        """Return the column of each row for an item's two hashes."""
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        """Add count occurrences of item."""
+        self._addHashes(*hash_pair(item), count)
+
+    def _addHashes(self, h1, h2, count=1):
+        """Add count occurrences of an item already hashed by hash_pair."""
+        for row, col in zip(self.rows, self._columns(h1, h2)):
+            row[col] += count
+        self.total += count
+
+    def estimate(self, item):
+        """Return estimated number of times item was added."""
+        h1, h2 = hash_pair(item)
+        return min(
+            row[col] for row, col in zip(self.rows, self._columns(h1, h2))
+        )
+
+    def errorBound(self):
+        """Return maximum overcount that holds with probability 1 - delta."""
+        return self.epsilon * self.total
+
+
+class HeavyHitters:
+    """
+    HeavyHitters keeps the k most frequent items with the Space-Saving
+    algorithm. Each count overestimates by at most total / k, and any item
+    added more than total / k times is guaranteed to be kept.
+    Items are grouped into buckets by count (a stream summary), so each
+    update takes constant time.
+    """
+
+    def __init__(self, k=100):
+        self.k = k
+        self.total = 0
+        self.counts = {}
+        self._buckets = {}
+        self._minCount = 0
+
+    def _move(self, item, old_count, new_count):
+        """Move item from the old_count bucket to the new_count bucket."""
+        bucket = self._buckets[old_count]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[old_count]
+            if old_count == self._minCount:
+                self._minCount = new_count
+        self._buckets.setdefault(new_count, {})[item] = None
+        self.counts[item] = new_count
+
+    def add(self, item):
+        """Add one occurrence of item."""
+        self.total += 1
+        count = self.counts.get(item)
+        if count is not None:
+            self._move(item, count, count + 1)
+        elif len(self.counts) < self.k:
+            self.counts[item] = 1
+            self._buckets.setdefault(1, {})[item] = None
+            self._minCount = 1
+        else:
+            # the new item takes over the slot and count of a smallest item
+            bucket = self._buckets[self._minCount]
+            smallest = next(iter(bucket))
+            del bucket[smallest]
+            count = self.counts.pop(smallest)
+            bucket[item] = None
+            self.counts[item] = count
+            self._move(item, count, count + 1)
+
+    def top(self, n=None):
+        """Return list of (item, count) pairs, most frequent first."""
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def errorBound(self):
+        """Return maximum overcount of any kept item."""
+        return self.total / self.k
+
+
+class HyperLogLog:
+    """
+    HyperLogLog estimates the number of distinct items using 2 ** p
+    registers. The relative standard error is 1.04 / sqrt(2 ** p).
+    """
+
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = [0] * self.m
+
+    def add(self, item):
+        """Add item."""
+        self._addHash(hash_pair(item)[0])
+
+    def _addHash(self, h):
+        """Add an item already hashed to 64 bits."""
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self):
+        """Return estimated number of distinct items added."""
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.m and zeros:
+            return self.m * math.log(self.m / zeros)
+        return raw
+
+    def errorBound(self):
+        """Return relative standard error of the estimate."""
+        return 1.04 / math.sqrt(self.m)
+
+
+class DecadeCounter:
+    """DecadeCounter counts people per birth decade in a fixed-size list."""
+
+    def __init__(self):
+        self.counts = [0] * ((Person.YEAREND - Person.YEARSTART) // 10 + 1)
+
+    def add(self, year):
+        """Count one person born in year."""
+        self.counts[(year - Person.YEARSTART) // 10] += 1
+
+    def totalByDecade(self):
+        """Return dictionary of counts keyed by decade."""
+        return {
+            Person.YEARSTART + 10 * i: count
+            for i, count in enumerate(self.counts)
+        }
+
+
+class ApproxAnalytics:
+    """
+    ApproxAnalytics updates sketches as people are generated so decade
+    counts, distinct names and the most duplicated names can be reported
+    in constant memory instead of traversing the whole tree.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, k=100, p=12):
+        self.numPeople = 0
+        self.nameCounts = CountMinSketch(epsilon, delta)
+        self.topNames = HeavyHitters(k)
+        self.distinct = HyperLogLog(p)
+        self.decades = DecadeCounter()
+
+    def add(self, person):
+        """Update every sketch with a newly generated person."""
+        full_name = person.fName + " " + person.lName
+        self.numPeople += 1
+        h1, h2 = hash_pair(full_name)
+        self.nameCounts._addHashes(h1, h2)
+        self.topNames.add(full_name)
+        self.distinct._addHash(h1)
+        self.decades.add(person.yearBorn)
+
+    def totalByDecade(self):
+        """Return exact dictionary of people counts keyed by decade."""
+        return self.decades.totalByDecade()
+
+    def distinctNames(self):
+        """Return estimated number of distinct full names."""
+        return self.distinct.estimate()
+
+    def duplicateNames(self, n=None):
+        """Return (name, estimated count) of kept names seen more than once."""
+        dupes = []
+        for name, _ in self.topNames.top():
+            count = self.nameCounts.estimate(name)
+            if count > 1:
+                dupes.append((name, count))
+        dupes.sort(key=lambda nc: nc[1], reverse=True)
+        return dupes if n is None else dupes[:n]
+
+
+def hash_pair(item):
+    """Return two independent 64-bit hashes of a string."""
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    return (
+        int.from_bytes(digest[:8], "big"),
+        int.from_bytes(digest[8:], "big") | 1,
+    )